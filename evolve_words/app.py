@@ -6,11 +6,14 @@ from __future__ import annotations
 
 ##############################################################################
 # Python imports.
+from bisect import insort
 from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
-from random import choice, randint
+from random import Random, choice
 from string import ascii_lowercase
+from threading import Event
+from time import monotonic
 from typing_extensions import Final
 
 ##############################################################################
@@ -30,7 +33,7 @@ from textual.widgets import (
     Rule,
     Static,
 )
-from textual.worker import get_current_worker
+from textual.worker import Worker, get_current_worker
 
 ##############################################################################
 # Textual Plotext imports.
@@ -65,84 +68,95 @@ class IntInput(Input):
         Returns:
             The validated value.
         """
-        if value.strip():
-            try:
-                _ = int(value)
-            except ValueError:
+        # Check the digits directly rather than having int() parse the
+        # value, allocate the result and then throw it away, on every
+        # keystroke.
+        if number := value.strip():
+            if not (number[1:] if number[0] in "+-" else number).isdecimal():
                 self.app.bell()
                 value = self.value
         return value
 
 
 ##############################################################################
-class Mutate:
+class Mutate:  # pylint: disable=too-few-public-methods
     """Utility class for mutating words."""
 
     @staticmethod
-    def random_char() -> str:
-        """Get a random lowercase letter.
-
-        Returns:
-            A random lowercase ASCII character.
-        """
-        return choice(ascii_lowercase)
-
-    @staticmethod
-    def point(word: str) -> str:
+    def _point(word: str, position: int, letter: str) -> str:
         """Point mutate the given word.
 
         Args:
             word: The word to mutate.
+            position: The position of the character to mutate.
+            letter: The letter to put in that position.
 
         Returns:
             The word with a character mutated.
         """
-        if not word:
-            return word
-        position = randint(0, len(word) - 1)
-        return word[:position] + Mutate.random_char() + word[position + 1 :]
+        return word[:position] + letter + word[position + 1 :]
 
     @staticmethod
-    def deletion(word: str) -> str:
+    def _deletion(word: str, position: int) -> str:
         """Deletion mutate the given word.
 
         Args:
             word: The word to mutate.
+            position: The position of the character to remove.
 
         Returns:
-            The word with a random character removed.
+            The word with a character removed.
         """
-        if not word:
-            return word
-        position = randint(0, len(word) - 1)
         return word[:position] + word[position + 1 :]
 
     @staticmethod
-    def insertion(word: str) -> str:
+    def _insertion(word: str, position: int, letter: str) -> str:
         """Insertion mutate the given word.
 
         Args:
             word: The word to mutate.
+            position: The position to insert the letter at.
+            letter: The letter to insert.
 
         Returns:
-            The word with a random character inserted.
+            The word with a character inserted.
         """
-        if not word:
-            return word
-        position = randint(0, len(word) - 1)
-        return word[:position] + Mutate.random_char() + word[position:]
+        return word[:position] + letter + word[position:]
 
     @staticmethod
-    def randomly(word: str) -> str:
-        """Randomly mutate the given word.
+    def generation(words: list[str], rng: Random) -> list[str]:
+        """Randomly mutate a whole generation of words in one pass.
 
         Args:
-            word: The word to mutate.
+            words: The words to mutate.
+            rng: The random number generator to use.
 
         Returns:
-            The word, randomly mutated.
+            The mutated words, one for each of the given words.
+
+        Note:
+            The kind of mutation and the replacement/inserted character are
+            drawn for the whole generation up front, rather than word by
+            word, which makes this quite a bit faster than drawing them as
+            each word is mutated.
         """
-        return choice((Mutate.point, Mutate.deletion, Mutate.insertion))(word)
+        kinds = rng.choices((0, 1, 2), k=len(words))
+        letters = rng.choices(ascii_lowercase, k=len(words))
+        random = rng.random
+        offspring: list[str] = []
+        append = offspring.append
+        for word, kind, letter in zip(words, kinds, letters):
+            if not word:
+                append(word)
+                continue
+            position = int(random() * len(word))
+            if kind == 0:
+                append(Mutate._point(word, position, letter))
+            elif kind == 1:
+                append(Mutate._deletion(word, position))
+            else:
+                append(Mutate._insertion(word, position, letter))
+        return offspring
 
 
 ##############################################################################
@@ -151,21 +165,27 @@ class Words(VerticalScroll):
 
     BORDER_TITLE = "Resulting words"
 
+    def __init__(self) -> None:
+        super().__init__()
+        self._shown = ""
+
     def compose(self) -> ComposeResult:
         """Compose the widget."""
         yield Static()
 
     def clear(self) -> None:
         """Clear the display."""
-        self.update(set())
+        self.update("")
 
-    def update(self, unique_words: set[str]) -> None:
+    def update(self, words_text: str) -> None:
         """Update the display.
 
         Args:
-            unique_words: The set of unique words found so far.
+            words_text: The text of the unique words found so far.
         """
-        self.query_one(Static).update(" ".join(sorted(unique_words)))
+        if words_text != self._shown:
+            self._shown = words_text
+            self.query_one(Static).update(words_text)
 
 
 ##############################################################################
@@ -191,22 +211,34 @@ class SizeCounts(Vertical):
         data.add_column("Word Size", key="size")
         data.add_column("Count", key="count")
 
-    def update(self, unique_words: set[str]) -> None:
+    def clear(self) -> None:
+        """Clear the table."""
+        self.query_one(DataTable).clear()
+
+    def update(self, size_counts: dict[int, int]) -> None:
         """Update the table.
 
         Args:
-            unique_words: The set of unique words found so far.
+            size_counts: The count of unique words of each size, in size order.
         """
+        # Work from what's actually in the table, only touching the rows
+        # that differ from the counts we've been given.
         data = self.query_one(DataTable)
-        data.clear()
-        data.add_rows(
-            [
-                (size, f"{count:,}")
-                for size, count in sorted(
-                    dict(Counter(len(word) for word in unique_words)).items()
-                )
-            ]
-        )
+        sizes = {str(size) for size in size_counts}
+        for row in [row for row in data.rows if row.value not in sizes]:
+            data.remove_row(row)
+        added = False
+        for size, count in size_counts.items():
+            key, shown = str(size), f"{count:,}"
+            if key not in data.rows:
+                data.add_row(size, shown, key=key)
+                added = True
+            elif data.get_cell(key, "count") != shown:
+                data.update_cell(key, "count", shown, update_width=True)
+        # A new size can turn up anywhere in the range, so if any rows were
+        # added make sure they're still in size order.
+        if added:
+            data.sort("size")
 
 
 ##############################################################################
@@ -220,15 +252,14 @@ class SizeCountPlot(PlotextPlot):
         self.plt.xlabel("Word Size")
         self.plt.ylabel("Frequency")
 
-    def update(self, unique_words: set[str]) -> None:
+    def update(self, size_counts: dict[int, int]) -> None:
         """Update the plot.
 
         Args:
-            unique_words: The set of unique words found so far.
+            size_counts: The count of unique words of each size, in size order.
         """
-        counts = dict(Counter(len(word) for word in unique_words))
         self.plt.cld()
-        self.plt.bar(list(counts.keys()), list(counts.values()))
+        self.plt.bar(list(size_counts.keys()), list(size_counts.values()))
         self.refresh()
 
 
@@ -329,9 +360,24 @@ class EvolveWordsApp(App[None]):
     DEFAULT_TARGET: Final[int] = 3_000
     """The default target population."""
 
+    REDRAW_INTERVAL: Final[float] = 0.05
+    """The minimum time, in seconds, between redraws of the words, counts and plots."""
+
+    MUTATION_BATCH: Final[int] = 256
+    """How many words to mutate between checks for cancellation."""
+
+    WORD_SOURCES: Final[tuple[Path, ...]] = (
+        Path("/usr/share/dict/words"),
+        Path("/usr/dict/words"),
+        Path("/etc/dictionaries-common/words"),
+        Path("/usr/share/words"),
+    )
+    """The places to look for a source of words, in order of preference."""
+
     def __init__(self) -> None:
         super().__init__()
-        self._words: set[str] = set()
+        self._words: frozenset[str] = frozenset()
+        self._by_length: dict[int, tuple[str, ...]] = {}
 
     def compose(self) -> ComposeResult:
         """Compose the DOM of the app."""
@@ -360,7 +406,7 @@ class EvolveWordsApp(App[None]):
         Returns:
             A path to a word file if one is found, otherwise `None`.
         """
-        for candidate in (Path("/usr/share/dict/words"), Path("/usr/dict/words")):
+        for candidate in self.WORD_SOURCES:
             if candidate.is_file():
                 return candidate
         return None
@@ -373,7 +419,7 @@ class EvolveWordsApp(App[None]):
         """
         # Sure, I could just generate a random ASCII letter, but this way we
         # ensure that we've picked a word that is in the source list.
-        return choice([word for word in self._words if len(word) == 1])
+        return choice(self._by_length[1])
 
     class Ready(Message):
         """Message to say that the app is ready to go."""
@@ -382,9 +428,13 @@ class EvolveWordsApp(App[None]):
     def load_words(self) -> None:
         """Load the words that will be used as the fitness test."""
         if words := self.find_words():
-            self._words = set(
-                word.lower() for word in words.read_text(encoding="utf-8").split()
-            )
+            self._words = frozenset(words.read_text(encoding="utf-8").lower().split())
+            by_length: dict[int, list[str]] = {}
+            for word in self._words:
+                by_length.setdefault(len(word), []).append(word)
+            self._by_length = {
+                length: tuple(group) for length, group in by_length.items()
+            }
             self.post_message(self.Ready())
         else:
             self.bell()
@@ -420,25 +470,54 @@ class EvolveWordsApp(App[None]):
             self.start_world()
             return
         self.query_one(Words).clear()
+        self.query_one(SizeCounts).clear()
         progenitor = self.progenitor()
         self.query_one(Log).clear().write_line(f"Progenitor selected: {progenitor}")
         self.query_one("#progenitor", Label).update(f"Progenitor: {progenitor}")
         self.run_world(progenitor, target_population)
 
     @dataclass
-    class Progress(Message):
-        """Message sent to report the progress."""
+    class Generation(Message):
+        """Message sent to report the outcome of each generation."""
 
-        population_size: int
-        """The current population size."""
-        unique_words: set[str]
-        """The set of unique words that have been created."""
         generation: int
         """The generation number."""
+        population_size: int
+        """The population size after the generation's cull."""
         last_cull: int
-        """How many words were culled in the last cull."""
+        """How many words were culled in the generation's cull."""
+        worker: Worker[None]
+        """The worker running the world that sent the report."""
+
+    @on(Generation)
+    def log_generation(self, event: Generation) -> None:
+        """Log the outcome of a generation.
+
+        Args:
+            event: The message containing the generation's details.
+        """
+        if event.worker.is_cancelled:
+            return
+        self.query_one("#generation", Label).update(f"Generation: {event.generation}")
+        self.query_one(Log).write_line(
+            f"Generation #{event.generation}: {event.last_cull} mutations culled. "
+            f"Population size is now {event.population_size}"
+        )
+
+    @dataclass
+    class Progress(Message):
+        """Message sent to report the progress."""
+
+        words_text: str
+        """The unique words that have been created, ready for display."""
+        size_counts: dict[int, int]
+        """The count of unique words of each size, in size order."""
         survival_history: list[float]
         """The survival rate history."""
+        worker: Worker[None]
+        """The worker running the world that sent the progress."""
+        shown: Event
+        """The event to set once the progress has been shown."""
 
     @on(Progress)
     def update_progress(self, event: Progress) -> None:
@@ -447,66 +526,127 @@ class EvolveWordsApp(App[None]):
         Args:
             event: The message containing the progress information.
         """
-        self.query_one(Words).update(event.unique_words)
-        self.query_one(SizeCounts).update(event.unique_words)
-        self.query_one(SizeCountPlot).update(event.unique_words)
+        # Always let the worker know we've caught up; but if the world that
+        # sent this has since been cancelled (most likely because a new one
+        # has been started) don't show it over the top of the new world.
+        event.shown.set()
+        if event.worker.is_cancelled:
+            return
+        self.query_one(Words).update(event.words_text)
+        self.query_one(SizeCounts).update(event.size_counts)
+        self.query_one(SizeCountPlot).update(event.size_counts)
         self.query_one(SurvivalRate).update(event.survival_history)
-        self.query_one("#generation", Label).update(f"Generation: {event.generation}")
-        self.query_one(Log).write_line(
-            f"Generation #{event.generation}: {event.last_cull} mutations culled. "
-            f"Population size is now {event.population_size}"
-        )
 
     @work(thread=True, exclusive=True)
-    def run_world(self, progenitor: str, target_population: int) -> None:
+    def run_world(  # pylint: disable=too-many-locals
+        self, progenitor: str, target_population: int
+    ) -> None:
         """Run the world within a thread."""
 
         # Get set up.
         worker = get_current_worker()
+        rng = Random()
+        # Things that don't change for the length of the run get bound
+        # locally, so the loop isn't looking them up over and over.
+        landscape = self._words
+        mutate = Mutate.generation
+        batch = self.MUTATION_BATCH
         population = [progenitor]
+        unique = {progenitor}
+        sorted_unique_words = [progenitor]
+        words_text: str | None = None
+        size_counts = Counter([len(progenitor)])
         generation = 0
         survival: list[float] = []
+        last_redraw = 0.0
+        progress_shown = Event()
+        progress_shown.set()
 
         # While the population hasn't reached the target value, or collapsed....
         while population and len(population) < target_population:
             # Create an offspring from each word in the population, randomly
-            # mutating as we do; then add them to the population. Note that
-            # we do this long-handed because we want to frequently check if
-            # the thread has been called on to cancel; we don't want a quit
-            # of the application to be lagged.
-            offspring: list[str] = []
-            for word in population:
+            # mutating as we do, and cull all of the offspring that aren't
+            # "fit"; there's no need to test the parents, every one of them
+            # is a word that has already survived a cull. Note that we do
+            # this in batches because we want to frequently check if the
+            # thread has been called on to cancel; we don't want a quit of
+            # the application to be lagged by a large population. Culling
+            # each batch as we go also means we never hold a full
+            # generation's worth of mostly-doomed offspring.
+            before = len(population) * 2
+            survivors: list[str] = []
+            for start in range(0, len(population), batch):
                 if worker.is_cancelled:
                     return
-                offspring.append(Mutate.randomly(word))
-            population.extend(offspring)
-
-            # Now cull all of the words that aren't "fit".
-            before = len(population)
-            population = [word for word in population if word in self._words]
+                survivors.extend(
+                    [
+                        word
+                        for word in mutate(population[start : start + batch], rng)
+                        if word in landscape
+                    ]
+                )
+            population.extend(survivors)
             if population:
                 survival.append((100 / before) * len(population))
             else:
                 survival.append(0)
 
-            # Update the UI with our progress.
+            # Keep track of the unique words we've seen, in order too so
+            # that the UI doesn't have to do the sorting, along with the
+            # count of their sizes; only the new words need looking at. If
+            # anything new turned up the text for display will need
+            # building again.
+            if new_words := set(survivors) - unique:
+                unique |= new_words
+                for word in new_words:
+                    insort(sorted_unique_words, word)
+                size_counts.update(map(len, new_words))
+                words_text = None
+
+            # If we've been asked to stop there's no sense in reporting on a
+            # world nobody wants to see any more.
+            if worker.is_cancelled:
+                return
+
+            # Every generation gets reported, so that the log tells the
+            # whole story of the run; that's cheap to do.
             self.post_message(
-                self.Progress(
-                    len(population),
-                    set(population),
-                    generation,
-                    before - len(population),
-                    survival,
+                self.Generation(
+                    generation, len(population), before - len(population), worker
                 )
             )
 
+            # Redrawing the words, counts and plots is not so cheap, so only
+            # do that if the UI has caught up with the last redraw we asked
+            # for and enough time has passed since then, or if this is the
+            # final generation. There's no sense in queueing up work the UI
+            # can't keep up with, or in redrawing faster than anyone can
+            # see.
+            if (
+                progress_shown.is_set()
+                and monotonic() - last_redraw >= self.REDRAW_INTERVAL
+            ) or len(population) >= target_population:
+                progress_shown.clear()
+                last_redraw = monotonic()
+                if words_text is None:
+                    words_text = " ".join(sorted_unique_words)
+                self.post_message(
+                    self.Progress(
+                        words_text,
+                        dict(sorted(size_counts.items())),
+                        survival,
+                        worker,
+                        progress_shown,
+                    )
+                )
+
             # Next population.
             generation += 1
 
         # Get the user's attention to let them know we've completed the run.
         if population:
             self.notify(
-                f"Generated {len(set(population))} unique words in {generation} generations."
+                f"Generated {len(unique)} unique words in {generation} generations."
             )
         else:
             self.notify("The population collapsed; nobody is left.", severity="warning")